@@ -14,3 +14,36 @@ if _cors_origins.strip() == "*":
     CORS_ORIGINS = ["*"]
 else:
     CORS_ORIGINS = [origin.strip() for origin in _cors_origins.split(",")]
+
+def _env_number(name: str, default, cast=int):
+    # Empty values (e.g. "DB_POOL_SIZE=" in .env or a blank CapRover var) count as unset
+    value = os.getenv(name, "").strip()
+    return cast(value) if value else default
+
+
+# Database connection pool (per process)
+# Default follows min(cpu_count * 2, max_db_connections / replicas)
+DB_MAX_CONNECTIONS = _env_number("DB_MAX_CONNECTIONS", 100)
+API_REPLICAS = max(_env_number("API_REPLICAS", 1), 1)
+DB_POOL_SIZE = _env_number(
+    "DB_POOL_SIZE",
+    max(min((os.cpu_count() or 1) * 2, DB_MAX_CONNECTIONS // API_REPLICAS), 1),
+)
+DB_MAX_OVERFLOW = _env_number("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_number("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_number("DB_POOL_RECYCLE", 1800)
+
+# Prepared statement cache size per connection (asyncpg + SQLAlchemy)
+# Set to 0 when connecting through PgBouncer in transaction pooling mode
+DB_STATEMENT_CACHE_SIZE = _env_number("DB_STATEMENT_CACHE_SIZE", 1024)
+
+# Number of PDF render worker processes (one Chromium browser each)
+# Fixed small default: os.cpu_count() reports the host's CPUs, not the container's limit
+RENDER_WORKERS = _env_number("RENDER_WORKERS", 2)
+# Seconds a render worker may take to launch its browser before start-up gives up
+RENDER_START_TIMEOUT = _env_number("RENDER_START_TIMEOUT", 60, float)
+
+# In-process cache of rendered PDFs keyed by HTML + options (off by default)
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+PDF_CACHE_TTL = _env_number("PDF_CACHE_TTL", 300)
+PDF_CACHE_MAX_BYTES = _env_number("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
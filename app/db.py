@@ -1,8 +1,82 @@
+import json
+from uuid import uuid4
+
+import orjson
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from .config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_STATEMENT_CACHE_SIZE,
+)
+
+# Prepared statements are cached per connection so the fixed ingest queries skip
+# parse/plan on the server. PgBouncer in transaction pooling mode does not keep a
+# client on one server connection, so cached statements break there: either use
+# session pooling or set DB_STATEMENT_CACHE_SIZE=0, which disables both caches and
+# gives every prepared statement a unique name to avoid collisions.
+# No custom startup parameters are sent (PgBouncer rejects ones it doesn't track),
+# so DB_STATEMENT_CACHE_SIZE=0 is all transaction pooling needs.
+_connect_args = {
+    "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+}
+if DB_STATEMENT_CACHE_SIZE == 0:
+    _connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+engine = create_async_engine(
+    DATABASE_URL,
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args=_connect_args,
+)
+
+
+def _jsonb_encode(value) -> bytes:
+    # Binary jsonb wire format: version byte 1 followed by the JSON text
+    try:
+        return b"\x01" + orjson.dumps(value)
+    except TypeError:
+        # orjson rejects valid JSON it can't represent natively (e.g. integers beyond 64 bits)
+        return b"\x01" + json.dumps(value, separators=(",", ":")).encode()
+
+
+def _jsonb_decode(value: bytes):
+    return orjson.loads(value[1:])
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _register_jsonb_codec(dbapi_connection, connection_record):
+    """Bind plain dicts/lists to jsonb parameters using orjson and the binary protocol"""
+    dbapi_connection.run_async(
+        lambda conn: conn.set_type_codec(
+            "jsonb",
+            encoder=_jsonb_encode,
+            decoder=_jsonb_decode,
+            schema="pg_catalog",
+            format="binary",
+        )
+    )
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_jit(dbapi_connection, connection_record):
+    """Ingest queries are short single-row writes; JIT compilation only adds latency"""
+    # A SET after connecting instead of a startup parameter keeps PgBouncer compatible.
+    # Under transaction pooling it lands on whichever server connection is in use (best effort).
+    dbapi_connection.run_async(lambda conn: conn.execute("SET jit = off"))
+
 
-engine = create_async_engine(DATABASE_URL, future=True, pool_pre_ping=True)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 Base = declarative_base()
 
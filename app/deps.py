@@ -1,3 +1,9 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Dict
+
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -5,11 +11,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .db import get_session
 
 
+@dataclass(slots=True, frozen=True)
 class IngestAuthed:
     """Represents an authenticated ingest request from n8n"""
-    def __init__(self, org_id: str, token_name: str):
-        self.org_id = org_id
-        self.token_name = token_name
+    org_id: str
+    token_name: str
+
+
+# Cache of valid tokens: sha256(token) -> (org_id, token_name)
+# Tokens are revoked through the Dashboard API, so entries expire after a short TTL
+# instead of being invalidated explicitly.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_token_locks: Dict[str, asyncio.Lock] = {}
+
+_TOKEN_LOOKUP = text("""
+    SELECT org_id, name
+    FROM ingest_tokens
+    WHERE token = :token AND is_active = TRUE
+""")
 
 
 async def ingest_authed(req: Request, db: AsyncSession = Depends(get_session)) -> IngestAuthed:
@@ -24,30 +43,49 @@ async def ingest_authed(req: Request, db: AsyncSession = Depends(get_session)) -
             detail="Missing Authorization header"
         )
     
-    # Expect format: "Bearer sk_live_..."
-    parts = auth_header.split(" ")
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    # Expect format: "Bearer sk_live_..." (scheme is case-insensitive)
+    token = auth_header[7:]
+    if (
+        not (auth_header.startswith("Bearer ") or auth_header[:7].lower() == "bearer ")
+        or not token
+        or " " in token
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Authorization header format. Expected: Bearer <token>"
         )
     
-    token = parts[1]
-    
-    # Look up token in database
-    query = text("""
-        SELECT org_id, name
-        FROM ingest_tokens
-        WHERE token = :token AND is_active = TRUE
-    """)
-    
-    row = (await db.execute(query, {"token": token})).first()
-    
-    if not row:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or inactive token"
-        )
+    # Hash the token so the raw secret is never kept in memory as a cache key
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        return IngestAuthed(*cached)
     
-    org_id, token_name = row
-    return IngestAuthed(str(org_id), token_name)
+    # Only one lookup per token at a time; concurrent requests wait and reuse the result
+    lock = _token_locks.get(key)
+    owner = lock is None
+    if owner:
+        lock = _token_locks[key] = asyncio.Lock()
+    async with lock:
+        try:
+            cached = _token_cache.get(key)
+            if cached is not None:
+                return IngestAuthed(*cached)
+            
+            # Look up token in database
+            row = (await db.execute(_TOKEN_LOOKUP, {"token": token})).first()
+            
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or inactive token"
+                )
+            
+            org_id, token_name = row
+            _token_cache[key] = (str(org_id), token_name)
+            return IngestAuthed(str(org_id), token_name)
+        finally:
+            # Only the creator removes the lock, once its lookup is done; waiters that
+            # just hit the cache must not drop a lock a newer request may now hold
+            if owner and _token_locks.get(key) is lock:
+                del _token_locks[key]
@@ -1,16 +1,69 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from .config import API_NAME, CORS_ORIGINS
+from .config import (
+    API_NAME,
+    CORS_ORIGINS,
+    RENDER_WORKERS,
+    RENDER_START_TIMEOUT,
+    PDF_CACHE_ENABLED,
+    PDF_CACHE_TTL,
+    PDF_CACHE_MAX_BYTES,
+)
+from .db import engine
+from .deps import ingest_authed
+from .render_pool import RenderPool
 from .routers import ingest as ingest_router
 from .routers import render as render_router
 
-app = FastAPI(title=API_NAME)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start pre-warmed render workers, each holding one Chromium browser
+    app.state.render_pool = None
+    app.state.render_error = None
+    if RENDER_WORKERS <= 0:
+        app.state.render_error = f"PDF rendering is disabled (RENDER_WORKERS={RENDER_WORKERS})"
+    else:
+        # Each worker's ready handshake is bounded by RENDER_START_TIMEOUT, so a hung
+        # browser launch fails start-up of the pool instead of blocking the app forever
+        pool = RenderPool(RENDER_WORKERS, start_timeout=RENDER_START_TIMEOUT)
+        try:
+            await pool.start()
+            app.state.render_pool = pool
+        except Exception as e:
+            # Ingest must keep working without a rendering engine; /render/pdf reports the error
+            app.state.render_error = e
+
+    # Rendered PDFs by content hash; bounded by total bytes rather than entry count
+    app.state.pdf_cache = (
+        TTLCache(maxsize=PDF_CACHE_MAX_BYTES, ttl=PDF_CACHE_TTL, getsizeof=len)
+        if PDF_CACHE_ENABLED
+        else None
+    )
+
+    yield
+
+    if app.state.render_pool is not None:
+        await app.state.render_pool.close()
+    # Close pooled database connections on shutdown
+    await engine.dispose()
+
+
+app = FastAPI(title=API_NAME, lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# A wildcard origin can't be combined with credentials per the CORS spec; with
+# credentials enabled Starlette echoes each request's Origin instead. Auth is a
+# Bearer token (no cookies), so public mode sends a static `*` without credentials.
+_cors_allow_all = CORS_ORIGINS == ["*"]
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
-    allow_credentials=True,
+    allow_credentials=not _cors_allow_all,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -19,6 +72,7 @@ app.add_middleware(
 async def health():
     return {"ok": True}
 
-# Register ingest router
-app.include_router(ingest_router.router)
-app.include_router(render_router.router)
+# Register token-authenticated routers
+# Auth runs once per request; handlers that need the org reuse the cached result
+app.include_router(ingest_router.router, dependencies=[Depends(ingest_authed)])
+app.include_router(render_router.router, dependencies=[Depends(ingest_authed)])
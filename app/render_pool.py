@@ -0,0 +1,149 @@
+import asyncio
+import sys
+from pathlib import Path
+from typing import List
+
+import orjson
+
+from .render_worker import STATUS_OK
+
+# Directory containing the `app` package, so `-m app.render_worker` resolves
+# regardless of the API process's working directory
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class RenderError(Exception):
+    """Raised when a render worker fails to start or to render a job"""
+
+
+class RenderWorkerExited(RenderError):
+    """Raised when a render worker process dies while handling a job"""
+
+
+class RenderWorker:
+    """Handle on one `app.render_worker` subprocess"""
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        # Set as soon as the worker is known to be unusable; returncode stays None
+        # until the event loop reaps the process, which may be after the handle is reused
+        self._dead = False
+
+    @classmethod
+    async def start(cls, timeout: float) -> "RenderWorker":
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.render_worker",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=_PROJECT_ROOT,
+        )
+        worker = cls(proc)
+        # Wait for the ready frame so a broken rendering engine surfaces at start-up
+        try:
+            status, payload = await asyncio.wait_for(worker._read_frame(), timeout=timeout)
+        except asyncio.IncompleteReadError:
+            await worker.close()
+            raise RenderError("Render worker exited during start-up")
+        except asyncio.TimeoutError:
+            worker.kill()
+            await worker.proc.wait()
+            raise RenderError(f"Render worker did not become ready within {timeout:g}s")
+        if status != STATUS_OK:
+            await worker.close()
+            raise RenderError(payload.decode(errors="replace"))
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return not self._dead and self.proc.returncode is None
+
+    async def _read_frame(self):
+        header = await self.proc.stdout.readexactly(5)
+        payload = await self.proc.stdout.readexactly(int.from_bytes(header[1:], "big"))
+        return header[0], payload
+
+    async def render(self, job: dict) -> bytes:
+        data = orjson.dumps(job)
+        try:
+            self.proc.stdin.write(len(data).to_bytes(4, "big") + data)
+            await self.proc.stdin.drain()
+            status, payload = await self._read_frame()
+        except (asyncio.IncompleteReadError, BrokenPipeError, ConnectionResetError):
+            self.kill()
+            raise RenderWorkerExited("Render worker exited unexpectedly")
+        except BaseException:
+            # Cancelled mid-job: the response would be left unread, so the worker can't be reused
+            self.kill()
+            raise
+        if status != STATUS_OK:
+            raise RenderError(payload.decode(errors="replace"))
+        return payload
+
+    def kill(self) -> None:
+        self._dead = True
+        if self.proc.returncode is None:
+            self.proc.kill()
+
+    async def close(self) -> None:
+        if self.alive:
+            # Closing stdin asks the worker to shut its browser down cleanly
+            self.proc.stdin.close()
+            try:
+                await asyncio.wait_for(self.proc.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+        await self.proc.wait()
+
+
+class RenderPool:
+    """Fixed-size pool of render workers; each worker renders one job at a time"""
+
+    def __init__(self, size: int, start_timeout: float):
+        if size < 1:
+            # An empty pool would make every render() wait forever on the idle queue
+            raise ValueError(f"RenderPool needs at least one worker, got {size}")
+        self.size = size
+        self.start_timeout = start_timeout
+        self._workers: List[RenderWorker] = []
+        self._idle: "asyncio.Queue[RenderWorker]" = asyncio.Queue()
+
+    async def start(self) -> None:
+        results = await asyncio.gather(
+            *(RenderWorker.start(self.start_timeout) for _ in range(self.size)),
+            return_exceptions=True,
+        )
+        started = [r for r in results if isinstance(r, RenderWorker)]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            for worker in started:
+                await worker.close()
+            raise errors[0]
+        self._workers = started
+        for worker in started:
+            self._idle.put_nowait(worker)
+
+    async def _replace(self, worker: RenderWorker) -> RenderWorker:
+        # On failure the caller puts the dead handle back, so the slot is retried next time
+        replacement = await RenderWorker.start(self.start_timeout)
+        self._workers[self._workers.index(worker)] = replacement
+        worker.kill()
+        await worker.proc.wait()
+        return replacement
+
+    async def render(self, job: dict) -> bytes:
+        # The idle queue holds exactly `size` workers, so it also bounds concurrency
+        worker = await self._idle.get()
+        try:
+            if not worker.alive:
+                worker = await self._replace(worker)
+            try:
+                return await worker.render(job)
+            except RenderWorkerExited:
+                # The worker may have died while idle; rendering is idempotent, so retry once
+                worker = await self._replace(worker)
+                return await worker.render(job)
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(worker.close() for worker in self._workers), return_exceptions=True)
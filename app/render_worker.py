@@ -0,0 +1,93 @@
+"""
+PDF render worker process.
+
+Started by the API as `python -m app.render_worker`. Each worker holds one
+Chromium browser and renders one job at a time.
+
+Wire protocol (binary, over stdin/stdout):
+- job:      4-byte big-endian length + JSON {"html": ..., "options": {...}}
+- response: 1-byte status (0 = ok, 1 = error) + 4-byte big-endian length + payload
+            (PDF bytes on success, UTF-8 error message on failure)
+
+Right after start-up the worker sends one empty ok frame once the browser is
+ready, or an error frame if it could not be launched.
+"""
+import asyncio
+import os
+import sys
+
+import orjson
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+def write_frame(out, status: int, payload: bytes) -> None:
+    out.write(bytes([status]) + len(payload).to_bytes(4, "big"))
+    out.write(payload)
+    out.flush()
+
+
+async def _open_stdio():
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+    # Keep a private handle on stdout for frames and point fd 1 at stderr,
+    # so stray output from Playwright/Chromium can't corrupt the protocol
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    return reader, out
+
+
+async def _render(browser, job: dict) -> bytes:
+    options = job["options"]
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.set_content(job["html"], wait_until=options["wait_until"])
+        return await page.pdf(
+            format=options["format"],
+            landscape=options["landscape"],
+            print_background=options["print_background"],
+            margin=options["margin"],
+        )
+    finally:
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+
+async def main() -> None:
+    reader, out = await _open_stdio()
+
+    try:
+        from playwright.async_api import async_playwright
+        pw = await async_playwright().start()
+        browser = await pw.chromium.launch(headless=True, args=["--no-sandbox", "--disable-setuid-sandbox"])
+    except Exception as e:
+        write_frame(out, STATUS_ERROR, str(e).encode())
+        return
+    write_frame(out, STATUS_OK, b"")
+
+    try:
+        while True:
+            try:
+                header = await reader.readexactly(4)
+            except asyncio.IncompleteReadError:
+                # Parent closed stdin: shut down
+                break
+            job = orjson.loads(await reader.readexactly(int.from_bytes(header, "big")))
+            try:
+                pdf_bytes = await _render(browser, job)
+            except Exception as e:
+                write_frame(out, STATUS_ERROR, str(e).encode())
+            else:
+                write_frame(out, STATUS_OK, pdf_bytes)
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
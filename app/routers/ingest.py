@@ -1,21 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-import json
+from typing import Annotated, Optional, Dict, Any, List, Literal
 
 from ..deps import ingest_authed, IngestAuthed
 from ..db import get_session
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 
+# SQL statements are built once at import time and reused by every request
+
+# Get or create the workflow in a single round-trip.
+# Requires the UNIQUE (org_id, name) constraint on workflows (see README); the no-op
+# update makes RETURNING yield the id for existing rows too.
+_WORKFLOW_UPSERT = text("""
+    INSERT INTO workflows (org_id, name, active)
+    VALUES (:org_id, :name, TRUE)
+    ON CONFLICT (org_id, name) DO UPDATE SET active = workflows.active
+    RETURNING id
+""")
+
+_RUN_INSERT = text("""
+    INSERT INTO workflow_runs (
+        org_id,
+        workflow_id,
+        started_at,
+        ended_at,
+        status,
+        duration_ms,
+        error_message,
+        external_run_id,
+        payload
+    )
+    VALUES (
+        :org_id,
+        :workflow_id,
+        :started_at,
+        :ended_at,
+        :status,
+        :duration_ms,
+        :error_message,
+        :external_run_id,
+        :payload
+    )
+    RETURNING id
+""")
+
+_APPROVAL_INSERT = text("""
+    INSERT INTO approvals (
+        org_id,
+        type,
+        status,
+        title,
+        data,
+        n8n_execute_webhook_url
+    )
+    VALUES (
+        :org_id,
+        :type,
+        'pending',
+        :title,
+        :data,
+        :webhook_url
+    )
+    RETURNING id
+""")
+
+_ASSET_INSERT = text("""
+    INSERT INTO approval_assets (
+        approval_id,
+        role,
+        storage_provider,
+        storage_key,
+        external_url,
+        filename,
+        mime_type,
+        size_bytes
+    )
+    VALUES (
+        :approval_id,
+        :role,
+        :storage_provider,
+        :storage_key,
+        :external_url,
+        :filename,
+        :mime_type,
+        :size_bytes
+    )
+""")
+
+_EVENT_INSERT = text("""
+    INSERT INTO approval_events (approval_id, event, metadata)
+    VALUES (:approval_id, 'created', :metadata)
+""")
+
 
 class WorkflowRunPayload(BaseModel):
     """Payload sent from n8n workflow to report execution data"""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     workflow_name: str = Field(..., description="Name of the workflow (e.g., 'Send Welcome Email')")
-    status: str = Field(..., description="Execution status: 'success', 'failed', or 'running'")
+    status: Literal["success", "failed", "running"] = Field(..., description="Execution status: 'success', 'failed', or 'running'")
     started_at: datetime = Field(..., description="When the workflow execution started (ISO 8601 timestamp)")
     ended_at: Optional[datetime] = Field(None, description="When the workflow execution ended (ISO 8601 timestamp)")
     error_message: Optional[str] = Field(None, description="Error message if status is 'failed'")
@@ -42,50 +129,19 @@ async def ingest_workflow_run(
     
     This endpoint:
     1. Validates the ingest token (automatically extracts org_id from token)
-    2. Creates workflow record if it doesn't exist (based on workflow_name + org_id)
-    3. Inserts workflow_run record with execution data
+    2. Upserts the workflow record (based on workflow_name + org_id)
+    3. Inserts workflow_run record with execution data (same transaction)
     4. Returns the created workflow_run_id
     
     Authentication: Bearer token in Authorization header
     """
     
-    # Validate status
-    valid_statuses = ["success", "failed", "running"]
-    if payload.status not in valid_statuses:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
-        )
-    
-    # Step 1: Get or create workflow record
-    # First, try to find existing workflow by name and org_id
-    workflow_query = text("""
-        SELECT id FROM workflows
-        WHERE org_id = :org_id AND name = :name
-        LIMIT 1
-    """)
-    
-    workflow_row = (await db.execute(
-        workflow_query,
+    # Step 1: Get or create workflow record in a single round-trip
+    result = await db.execute(
+        _WORKFLOW_UPSERT,
         {"org_id": auth.org_id, "name": payload.workflow_name}
-    )).first()
-    
-    if workflow_row:
-        workflow_id = workflow_row[0]
-    else:
-        # Create new workflow record
-        create_workflow_query = text("""
-            INSERT INTO workflows (org_id, name, active)
-            VALUES (:org_id, :name, TRUE)
-            RETURNING id
-        """)
-        
-        result = await db.execute(
-            create_workflow_query,
-            {"org_id": auth.org_id, "name": payload.workflow_name}
-        )
-        workflow_id = result.scalar_one()
-        await db.commit()
+    )
+    workflow_id = result.scalar_one()
     
     # Step 2: Calculate duration_ms if both timestamps provided
     duration_ms = None
@@ -93,37 +149,7 @@ async def ingest_workflow_run(
         duration_ms = int((payload.ended_at - payload.started_at).total_seconds() * 1000)
     
     # Step 3: Insert workflow_run record
-    insert_run_query = text("""
-        INSERT INTO workflow_runs (
-            org_id,
-            workflow_id,
-            started_at,
-            ended_at,
-            status,
-            duration_ms,
-            error_message,
-            external_run_id,
-            payload
-        )
-        VALUES (
-            :org_id,
-            :workflow_id,
-            :started_at,
-            :ended_at,
-            :status,
-            :duration_ms,
-            :error_message,
-            :external_run_id,
-            :payload
-        )
-        RETURNING id
-    """)
-    
-    # Prepare payload JSONB (metadata + original payload for reference)
-    # Convert to JSON string for asyncpg
-    payload_jsonb = json.dumps(payload.metadata or {})
-    
-    result = await db.execute(insert_run_query, {
+    result = await db.execute(_RUN_INSERT, {
         "org_id": auth.org_id,
         "workflow_id": workflow_id,
         "started_at": payload.started_at,
@@ -132,7 +158,8 @@ async def ingest_workflow_run(
         "duration_ms": duration_ms,
         "error_message": payload.error_message,
         "external_run_id": payload.external_run_id,
-        "payload": payload_jsonb
+        # JSONB values are passed as plain dicts; the connection's jsonb codec encodes them
+        "payload": payload.metadata or {}
     })
     
     workflow_run_id = result.scalar_one()
@@ -150,13 +177,20 @@ async def ingest_workflow_run(
 # APPROVAL INGEST
 # ============================================================================
 
+# Bounded asset strings, stored as sent; presigned URLs carry signatures/session tokens, so allow more room
+AssetStr = Annotated[str, StringConstraints(max_length=2048)]
+AssetUrl = Annotated[str, StringConstraints(max_length=8192)]
+
+
 class ApprovalAssetPayload(BaseModel):
     """Asset (file) attached to an approval"""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     role: str = Field(..., description="Asset role: 'source_email_body_html', 'draft_order_confirmation_pdf', etc.")
     storage_provider: str = Field(default="minio", description="Storage provider: 'minio', 's3', 'external', 'local'")
-    storage_key: Optional[str] = Field(None, description="MinIO/S3 key path (e.g., 'approvals/order-1042/confirm.pdf')")
-    external_url: str = Field(..., description="Presigned URL from MinIO/S3 (24-48h expiry)")
-    filename: Optional[str] = Field(None, description="Original filename")
+    storage_key: Optional[AssetStr] = Field(None, description="MinIO/S3 key path (e.g., 'approvals/order-1042/confirm.pdf')")
+    external_url: AssetUrl = Field(..., description="Presigned URL from MinIO/S3 (24-48h expiry)")
+    filename: Optional[AssetStr] = Field(None, description="Original filename")
     mime_type: Optional[str] = Field(None, description="MIME type (e.g., 'application/pdf')")
     size_bytes: Optional[int] = Field(None, description="File size in bytes")
 
@@ -167,7 +201,9 @@ class ApprovalIngestPayload(BaseModel):
     The preview field is accepted for request compatibility but is not stored.
     Only `data` is persisted in the approvals table.
     """
-    type: str = Field(..., description="Approval type: 'order', 'linkedin_post', 'gmail_reply'")
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    type: Literal["order", "linkedin_post", "gmail_reply"] = Field(..., description="Approval type: 'order', 'linkedin_post', 'gmail_reply'")
     title: str = Field(..., description="Short title (e.g., 'Order BR-2025-1042')")
     preview: Dict[str, Any] = Field({}, description="UI preview data (ignored, not stored)")
     data: Dict[str, Any] = Field(default_factory=dict, description="Execution payload (free-form JSON)")
@@ -193,11 +229,10 @@ async def ingest_approval(
     
     This endpoint:
     1. Validates the ingest token (automatically extracts org_id from token)
-    2. Validates the type is in allowed list
-    3. Inserts approval record (status='pending')
-    4. Inserts all assets (linked to approval_id)
-    5. Logs 'created' event
-    6. Returns approval_id
+    2. Inserts approval record (status='pending')
+    3. Inserts all assets (linked to approval_id)
+    4. Logs 'created' event
+    5. Returns approval_id
     
     Authentication: Bearer token in Authorization header
     
@@ -225,42 +260,14 @@ async def ingest_approval(
     }
     """
     
-    # Validate type
-    valid_types = ["order", "linkedin_post", "gmail_reply"]
-    if payload.type not in valid_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid type. Must be one of: {', '.join(valid_types)}"
-        )
-    
     # Step 1: Insert approval record
     # Store only the provided data payload; ignore preview entirely
     combined_data = dict(payload.data or {})
-    insert_approval_query = text("""
-        INSERT INTO approvals (
-            org_id,
-            type,
-            status,
-            title,
-            data,
-            n8n_execute_webhook_url
-        )
-        VALUES (
-            :org_id,
-            :type,
-            'pending',
-            :title,
-            :data,
-            :webhook_url
-        )
-        RETURNING id
-    """)
-    
-    result = await db.execute(insert_approval_query, {
+    result = await db.execute(_APPROVAL_INSERT, {
         "org_id": auth.org_id,
         "type": payload.type,
         "title": payload.title,
-        "data": json.dumps(combined_data),
+        "data": combined_data,
         "webhook_url": payload.n8n_execute_webhook_url  # Can be None now
     })
     
@@ -268,31 +275,9 @@ async def ingest_approval(
     
     # Step 2: Insert assets
     if payload.assets:
-        insert_asset_query = text("""
-            INSERT INTO approval_assets (
-                approval_id,
-                role,
-                storage_provider,
-                storage_key,
-                external_url,
-                filename,
-                mime_type,
-                size_bytes
-            )
-            VALUES (
-                :approval_id,
-                :role,
-                :storage_provider,
-                :storage_key,
-                :external_url,
-                :filename,
-                :mime_type,
-                :size_bytes
-            )
-        """)
-        
-        for asset in payload.assets:
-            await db.execute(insert_asset_query, {
+        # Passing a list of parameter sets sends all assets as one executemany batch
+        await db.execute(_ASSET_INSERT, [
+            {
                 "approval_id": approval_id,
                 "role": asset.role,
                 "storage_provider": asset.storage_provider,
@@ -301,21 +286,18 @@ async def ingest_approval(
                 "filename": asset.filename,
                 "mime_type": asset.mime_type,
                 "size_bytes": asset.size_bytes
-            })
+            }
+            for asset in payload.assets
+        ])
     
     # Step 3: Log 'created' event
-    insert_event_query = text("""
-        INSERT INTO approval_events (approval_id, event, metadata)
-        VALUES (:approval_id, 'created', :metadata)
-    """)
-    
-    await db.execute(insert_event_query, {
+    await db.execute(_EVENT_INSERT, {
         "approval_id": approval_id,
-        "metadata": json.dumps({
+        "metadata": {
             "type": payload.type,
             "asset_count": len(payload.assets),
             "token_name": auth.token_name
-        })
+        }
     })
     
     await db.commit()
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, Response, HTTPException, status, Query
-from pydantic import BaseModel, Field
+import hashlib
+from binascii import b2a_base64
+
+import orjson
+from fastapi import APIRouter, Request, Response, HTTPException, status, Query
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, Literal
 
-from ..deps import ingest_authed, IngestAuthed
+from ..render_pool import RenderError
 
 router = APIRouter(prefix="/render", tags=["render"])
 
@@ -23,6 +27,8 @@ PdfFormat = Literal[
 
 
 class PdfOptions(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     format: PdfFormat = Field(default="A4")
     landscape: bool = Field(default=False)
     printBackground: bool = Field(default=True)
@@ -30,10 +36,16 @@ class PdfOptions(BaseModel):
     marginRight: str = Field(default="10mm")
     marginBottom: str = Field(default="10mm")
     marginLeft: str = Field(default="10mm")
-    # Accept puppeteer-style and playwright-style values, normalize later
-    waitUntil: Literal["load", "domcontentloaded", "networkidle0", "networkidle2", "networkidle", "commit"] = Field(default="networkidle0")
+    # Accept puppeteer-style and playwright-style values, normalized to Playwright's on validation
+    waitUntil: Literal["load", "domcontentloaded", "networkidle0", "networkidle2", "networkidle", "commit"] = Field(default="networkidle0", validate_default=True)
     fileName: Optional[str] = Field(default="document.pdf")
 
+    @field_validator("waitUntil")
+    @classmethod
+    def _normalize_wait_until(cls, v: str) -> str:
+        # Playwright only knows `networkidle`; map puppeteer's `networkidle0/2` onto it
+        return "networkidle" if v in ("networkidle0", "networkidle2") else v
+
 
 class HtmlRenderRequest(BaseModel):
     html: str = Field(..., description="HTML content to render")
@@ -42,55 +54,63 @@ class HtmlRenderRequest(BaseModel):
 
 @router.post("/pdf")
 async def render_pdf(
+    request: Request,
     body: HtmlRenderRequest,
-    auth: IngestAuthed = Depends(ingest_authed),
     return_: Optional[str] = Query(default=None, alias="return"),
 ):
-    try:
-        # Lazy import to avoid import-time overhead
-        from playwright.async_api import async_playwright
-    except Exception as e:
+    pool = request.app.state.render_pool
+    if pool is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Rendering engine not available: {e}",
+            detail=f"Rendering engine not available: {request.app.state.render_error}",
         )
 
     # Map options
-    fmt = body.options.format
-    landscape = body.options.landscape
-    print_bg = body.options.printBackground
-    margins = {
-        "top": body.options.marginTop,
-        "right": body.options.marginRight,
-        "bottom": body.options.marginBottom,
-        "left": body.options.marginLeft,
+    job = {
+        "html": body.html,
+        "options": {
+            "format": body.options.format,
+            "landscape": body.options.landscape,
+            "print_background": body.options.printBackground,
+            "margin": {
+                "top": body.options.marginTop,
+                "right": body.options.marginRight,
+                "bottom": body.options.marginBottom,
+                "left": body.options.marginLeft,
+            },
+            "wait_until": body.options.waitUntil,
+        },
     }
-    # Normalize waitUntil for Playwright: `networkidle0/2` -> `networkidle`
-    wait_until_in = body.options.waitUntil
-    wait_until = "networkidle" if wait_until_in in ("networkidle0", "networkidle2", "networkidle") else wait_until_in
 
-    # Render using Playwright
-    pdf_bytes: bytes
-    async with async_playwright() as p:
+    # Identical HTML + options render to the same PDF; fileName only affects headers
+    cache = request.app.state.pdf_cache
+    cache_key = None
+    pdf_bytes = None
+    if cache is not None:
+        cache_key = hashlib.blake2b(
+            orjson.dumps({"h": body.html, "o": body.options.model_dump(exclude={"fileName"})}),
+            digest_size=16,
+        ).hexdigest()
+        pdf_bytes = cache.get(cache_key)
+
+    if pdf_bytes is None:
+        # Render in a worker process; waits for an idle worker when all are busy
         try:
-            browser = await p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-setuid-sandbox"])  # type: ignore
-            context = await browser.new_context()
-            page = await context.new_page()
-            await page.set_content(body.html, wait_until=wait_until)  # type: ignore
-            pdf_bytes = await page.pdf(format=fmt, landscape=landscape, print_background=print_bg, margin=margins)  # type: ignore
-        finally:
-            try:
-                await context.close()
-            except Exception:
-                pass
+            pdf_bytes = await pool.render(job)
+        except RenderError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"PDF rendering failed: {e}",
+            )
+        if cache is not None:
             try:
-                await browser.close()
-            except Exception:
+                cache[cache_key] = pdf_bytes
+            except ValueError:
+                # Larger than the whole cache; serve it uncached
                 pass
 
     if return_ == "base64":
-        import base64
-        b64 = base64.b64encode(pdf_bytes).decode("ascii")
+        b64 = b2a_base64(pdf_bytes, newline=False).decode("ascii")
         return {
             "ok": True,
             "fileName": body.options.fileName or "document.pdf",
@@ -0,0 +1,69 @@
+"""
+Minimal stand-in for `playwright.async_api`, used by tests/test_render_pool.py.
+
+Put on PYTHONPATH for render worker subprocesses. The HTML content selects
+the behaviour of a job:
+- "slow": takes 5 seconds (to cancel mid-render)
+- "die":  the worker process exits immediately
+- "boom": page.pdf() raises
+- anything else: returns the HTML bytes as the "PDF"
+
+Setting STUB_PLAYWRIGHT_HANG makes the browser launch hang.
+"""
+import asyncio
+import os
+
+
+class _Page:
+    async def set_content(self, html, wait_until):
+        # Stray stdout output must not corrupt the worker protocol
+        print("stub playwright: set_content")
+        if html == "slow":
+            await asyncio.sleep(5)
+        if html == "die":
+            os._exit(1)
+        self._html = html
+
+    async def pdf(self, **kwargs):
+        if self._html == "boom":
+            raise RuntimeError("stub render failure")
+        return self._html.encode()
+
+
+class _Context:
+    async def new_page(self):
+        return _Page()
+
+    async def close(self):
+        pass
+
+
+class _Browser:
+    async def new_context(self):
+        return _Context()
+
+    async def close(self):
+        pass
+
+
+class _Chromium:
+    async def launch(self, **kwargs):
+        if os.environ.get("STUB_PLAYWRIGHT_HANG"):
+            await asyncio.sleep(3600)
+        return _Browser()
+
+
+class _Playwright:
+    chromium = _Chromium()
+
+    async def stop(self):
+        pass
+
+
+class _Starter:
+    async def start(self):
+        return _Playwright()
+
+
+def async_playwright():
+    return _Starter()
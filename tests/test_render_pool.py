@@ -0,0 +1,121 @@
+"""
+Render worker pool tests against a stubbed Playwright (tests/stubs/playwright).
+
+Run from the project root: python -m unittest discover tests
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.render_pool import RenderError, RenderPool
+
+STUBS_DIR = Path(__file__).resolve().parent / "stubs"
+
+OPTIONS = {
+    "format": "A4",
+    "landscape": False,
+    "print_background": True,
+    "margin": {},
+    "wait_until": "load",
+}
+
+
+def job(html: str) -> dict:
+    return {"html": html, "options": OPTIONS}
+
+
+class RenderPoolTest(unittest.TestCase):
+    def setUp(self):
+        self._environ = dict(os.environ)
+        # Worker subprocesses inherit the environment and import the stub instead of Playwright
+        os.environ["PYTHONPATH"] = os.pathsep.join(
+            p for p in (str(STUBS_DIR), os.environ.get("PYTHONPATH")) if p
+        )
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self._environ)
+
+    def run_with_pool(self, size, scenario, start_timeout=30):
+        async def main():
+            pool = RenderPool(size, start_timeout=start_timeout)
+            await pool.start()
+            try:
+                await scenario(pool)
+            finally:
+                await pool.close()
+
+        asyncio.run(asyncio.wait_for(main(), timeout=60))
+
+    def test_renders_concurrent_jobs(self):
+        async def scenario(pool):
+            results = await asyncio.gather(*(pool.render(job(f"doc-{i}")) for i in range(5)))
+            self.assertEqual(results, [f"doc-{i}".encode() for i in range(5)])
+
+        self.run_with_pool(2, scenario)
+
+    def test_render_error_keeps_worker(self):
+        async def scenario(pool):
+            with self.assertRaisesRegex(RenderError, "stub render failure"):
+                await pool.render(job("boom"))
+            self.assertEqual(await pool.render(job("ok")), b"ok")
+
+        self.run_with_pool(1, scenario)
+
+    def test_cancelled_job_replaces_worker(self):
+        async def scenario(pool):
+            task = asyncio.create_task(pool.render(job("slow")))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(await pool.render(job("after-cancel")), b"after-cancel")
+
+        self.run_with_pool(1, scenario)
+
+    def test_crash_mid_job_replaces_worker(self):
+        async def scenario(pool):
+            with self.assertRaisesRegex(RenderError, "exited unexpectedly"):
+                await pool.render(job("die"))
+            self.assertEqual(await pool.render(job("after-crash")), b"after-crash")
+
+        self.run_with_pool(1, scenario)
+
+    def test_idle_crash_is_retried_on_fresh_worker(self):
+        async def scenario(pool):
+            pool._workers[0].proc.kill()
+            self.assertEqual(await pool.render(job("after-kill")), b"after-kill")
+
+        self.run_with_pool(1, scenario)
+
+    def test_start_from_other_working_directory(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                async def scenario(pool):
+                    self.assertEqual(await pool.render(job("ok")), b"ok")
+
+                self.run_with_pool(1, scenario)
+            finally:
+                os.chdir(cwd)
+
+    def test_hung_start_times_out(self):
+        os.environ["STUB_PLAYWRIGHT_HANG"] = "1"
+
+        async def main():
+            pool = RenderPool(2, start_timeout=1)
+            with self.assertRaisesRegex(RenderError, "did not become ready"):
+                await pool.start()
+
+        asyncio.run(asyncio.wait_for(main(), timeout=30))
+
+    def test_rejects_empty_pool(self):
+        with self.assertRaises(ValueError):
+            RenderPool(0, start_timeout=1)
+
+
+if __name__ == "__main__":
+    unittest.main()